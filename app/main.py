@@ -4,11 +4,13 @@ from fastapi.responses import JSONResponse
 from enum import Enum
 from pydantic import BaseModel, ValidationError
 import xgboost as xgb
+import numpy as np
 import pandas as pd
 import json
 import os
 import logging
-from typing import Dict
+from typing import Dict, List, Union
+from functools import lru_cache
 from dotenv import load_dotenv
 import os
 from google.cloud import storage
@@ -42,10 +44,19 @@ class PenguinFeatures(BaseModel):
     sex: Sex
     island: Island
 
+# Lookup tables for one-hot encoding; Female and Biscoe are the dropped baselines
+_NUMERIC_FEATURES = ('bill_length_mm', 'bill_depth_mm', 'flipper_length_mm', 'body_mass_g')
+_SEX_MALE = {Sex.Male: 1.0, Sex.Female: 0.0}
+_ISLAND_CODES = {Island.Biscoe: 0, Island.Dream: 1, Island.Torgersen: 2}
+# Row i holds the (island_Dream, island_Torgersen) bits for island code i
+_ISLAND_TABLE = np.eye(len(_ISLAND_CODES), dtype=np.float32)[:, 1:]
+
 # Global variables for model and metadata
 model = None
 label_encoder_classes = None
 feature_names = None
+feature_index = None  # feature name -> column position, built once at load time
+feature_columns = None  # pandas Index reused for every preprocessed row
 
 def download_from_gcs(bucket_name: str, source_blob_name: str, destination_file_name: str):
     """Download a file from Google Cloud Storage"""
@@ -61,9 +72,15 @@ def download_from_gcs(bucket_name: str, source_blob_name: str, destination_file_
         logger.error(f"Failed to download {source_blob_name} from GCS: {str(e)}")
         return False
 
+@lru_cache(maxsize=None)
 def load_model_and_metadata():
-    """Load the trained XGBoost model and metadata from local files or GCS"""
-    global model, label_encoder_classes, feature_names
+    """
+    Load the trained XGBoost model and metadata from local files or GCS
+
+    Cached so that repeated calls (startup event, test fixtures) only load once
+    per process
+    """
+    global model, label_encoder_classes, feature_names, feature_index, feature_columns
     
     logger.info("Starting model loading process...")
     
@@ -163,46 +180,50 @@ def load_model_and_metadata():
         
         logger.info(f"Model metadata loaded successfully from local files")
     
+    feature_index = {name: i for i, name in enumerate(feature_names)}
+    feature_columns = pd.Index(feature_names)
+    
     logger.info(f"Target classes: {label_encoder_classes}")
     logger.info(f"Feature names: {feature_names}")
 
-def preprocess_features(penguin_data: PenguinFeatures) -> pd.DataFrame:
+def preprocess_features(penguin_data: Union[PenguinFeatures, List[PenguinFeatures]]) -> pd.DataFrame:
     """
     Apply one-hot encoding consistent with training process
-    """
-    logger.debug(f"Preprocessing input features: {penguin_data.model_dump()}")
     
-    # Convert to DataFrame
-    data_dict = penguin_data.model_dump()
-    df = pd.DataFrame([data_dict])
-    
-    # Convert enum values to their string values for proper one-hot encoding
-    df['sex'] = df['sex'].apply(lambda x: x.value if hasattr(x, 'value') else str(x))
-    df['island'] = df['island'].apply(lambda x: x.value if hasattr(x, 'value') else str(x))
-    
-    # Apply one-hot encoding to categorical features (sex, island)
-    df_encoded = pd.get_dummies(df, columns=['sex', 'island'], drop_first=False)
+    Accepts a single penguin or a list of them and returns one row per penguin.
+    Values are written straight into a preallocated float32 array, with the
+    categorical columns filled from lookup tables rather than per-row branches
+    """
+    if isinstance(penguin_data, PenguinFeatures):
+        logger.debug(f"Preprocessing input features: {penguin_data.model_dump()}")
+        samples = [penguin_data]
+    else:
+        samples = list(penguin_data)
+        logger.debug(f"Preprocessing a batch of {len(samples)} penguins")
     
-    # Map the generated column names to expected feature names
-    # pandas creates sex_male, but model expects sex_Male
-    if 'sex_male' in df_encoded.columns:
-        df_encoded['sex_Male'] = df_encoded['sex_male']
-        df_encoded = df_encoded.drop('sex_male', axis=1)
+    n = len(samples)
+    rows = np.zeros((n, len(feature_names)), dtype=np.float32)
     
-    # pandas creates sex_female, but we need sex_Male for consistency with training
-    if 'sex_female' in df_encoded.columns:
-        df_encoded['sex_Male'] = 1 - df_encoded['sex_female']  # Invert female to get Male
-        df_encoded = df_encoded.drop('sex_female', axis=1)
+    # Numeric features are passed through unchanged
+    for name in _NUMERIC_FEATURES:
+        rows[:, feature_index[name]] = np.fromiter(
+            (getattr(sample, name) for sample in samples), dtype=np.float32, count=n
+        )
     
-    # Ensure all expected features are present in correct order
-    for feature in feature_names:
-        if feature not in df_encoded.columns:
-            df_encoded[feature] = 0
+    # One-hot encode sex and island through the lookup tables
+    rows[:, feature_index['sex_Male']] = np.fromiter(
+        (_SEX_MALE[Sex(sample.sex)] for sample in samples), dtype=np.float32, count=n
+    )
+    island_codes = np.fromiter(
+        (_ISLAND_CODES[Island(sample.island)] for sample in samples), dtype=np.intp, count=n
+    )
+    island_columns = [feature_index['island_Dream'], feature_index['island_Torgersen']]
+    rows[:, island_columns] = _ISLAND_TABLE.take(island_codes, axis=0)
     
-    logger.debug(f"Features after preprocessing: {df_encoded.columns.tolist()}")
+    logger.debug(f"Features after preprocessing: {feature_names}")
     
     # Return features in same order as training
-    return df_encoded[feature_names]
+    return pd.DataFrame(rows, columns=feature_columns, copy=False)
 
 # Initialize FastAPI app
 app = FastAPI(title="Penguin Species Prediction API")
@@ -300,13 +321,14 @@ async def predict_penguin_species(penguin_data: PenguinFeatures) -> Dict:
         # Preprocess input with consistent one-hot encoding
         processed_features = preprocess_features(penguin_data)
         
-        # Make prediction
-        prediction = model.predict(processed_features)[0]
+        # Make prediction; the predicted class is the most probable one, so a
+        # single predict_proba pass covers both
         prediction_proba = model.predict_proba(processed_features)[0]
+        prediction = int(prediction_proba.argmax())
         
         # Convert prediction index to species name
         predicted_species = label_encoder_classes[prediction]
-        confidence = float(max(prediction_proba))
+        confidence = float(prediction_proba[prediction])
         
         logger.info(f"Prediction successful: {predicted_species} (confidence: {confidence:.4f})")
         
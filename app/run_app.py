@@ -10,4 +10,20 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import and run
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="127.0.0.1", port=8000, reload=False)
\ No newline at end of file
+    # uvloop is not available on Windows, fall back to the asyncio loop there
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+
+    # Reload mode stays off: it only supports a single process and adds a
+    # file-watcher that competes with request handling for CPU time
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=max(2, os.cpu_count() or 2),
+        loop=loop,
+        http="httptools",
+        proxy_headers=True,
+        access_log=False,
+        reload=False,
+        log_level="warning",
+    )
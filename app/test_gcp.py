@@ -1,15 +1,20 @@
 #!/usr/bin/env python3
 import os
-import tempfile
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
 from dotenv import load_dotenv
 from google.cloud import storage
 
 load_dotenv("../.env")
 
+# Read-only snapshot of the environment taken after loading
+ENV = MappingProxyType(dict(os.environ))
+
 def test_gcp_connection():
     """Test GCP bucket access and model download"""
-    credentials_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    bucket_name = os.getenv("GCS_BUCKET_NAME")
+    credentials_path = ENV.get("GOOGLE_APPLICATION_CREDENTIALS")
+    bucket_name = ENV.get("GCS_BUCKET_NAME")
     
     print(f"Testing GCP connection...")
     print(f"Credentials: {credentials_path}")
@@ -25,8 +30,9 @@ def test_gcp_connection():
         bucket = storage_client.bucket(bucket_name)
         
         # List files in bucket
+        max_results = 10
         print(f"\nFiles in bucket '{bucket_name}':")
-        blobs = list(bucket.list_blobs(max_results=10))
+        blobs = list(bucket.list_blobs(max_results=max_results))
         
         if not blobs:
             print("No files found in bucket")
@@ -35,44 +41,51 @@ def test_gcp_connection():
         for blob in blobs:
             print(f"  - {blob.name} ({blob.size} bytes)")
             
-        # Try to download and test both model files
-        model_blob = bucket.blob("model.json")
-        metadata_blob = bucket.blob("model_metadata.json")
+        # The listing already tells us which files exist, so no extra HEAD calls
+        found = {blob.name: blob for blob in blobs}
+        
+        # A full page may have cut the listing short, so only then look missing
+        # files up by name; get_blob returns None when the object does not exist
+        def find_blob(name):
+            if name not in found and len(blobs) == max_results:
+                return bucket.get_blob(name)
+            return found.get(name)
+        
+        model_blob = find_blob("model.json")
+        metadata_blob = find_blob("model_metadata.json")
         
-        if not model_blob.exists():
+        if model_blob is None:
             print("model.json not found in bucket")
             return False
             
-        if not metadata_blob.exists():
+        if metadata_blob is None:
             print("model_metadata.json not found in bucket")
             return False
         
-        # Download both files
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as model_tmp:
-            model_blob.download_to_filename(model_tmp.name)
-            print(f"Downloaded model.json to {model_tmp.name}")
-            
-            # Test if it's a valid XGBoost model by checking file size and basic content
-            file_size = os.path.getsize(model_tmp.name)
-            print(f"Model file size: {file_size} bytes")
-            
-            with open(model_tmp.name, 'r') as f:
-                first_line = f.readline().strip()
-                print(f"Model file starts with: {first_line[:100]}...")
-                
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as meta_tmp:
-            metadata_blob.download_to_filename(meta_tmp.name)
-            print(f"Downloaded model_metadata.json to {meta_tmp.name}")
-            
-            # Test metadata content
-            with open(meta_tmp.name, 'r') as f:
-                import json
-                metadata = json.load(f)
-                print(f"Metadata keys: {list(metadata.keys())}")
-                if 'feature_names' in metadata:
-                    print(f"Feature names: {metadata['feature_names']}")
-                if 'label_encoder_classes' in metadata:
-                    print(f"Label classes: {metadata['label_encoder_classes']}")
+        # The downloads are independent, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            # Download both files straight into memory
+            model_download = executor.submit(model_blob.download_as_bytes)
+            metadata_download = executor.submit(metadata_blob.download_as_bytes)
+            model_data = model_download.result()
+            metadata_data = metadata_download.result()
+        
+        print("Downloaded model.json")
+        
+        # Test if it's a valid XGBoost model by checking size and basic content
+        print(f"Model file size: {len(model_data)} bytes")
+        first_line = model_data[:100].split(b"\n", 1)[0].decode(errors="replace").strip()
+        print(f"Model file starts with: {first_line}...")
+        
+        print("Downloaded model_metadata.json")
+        
+        # Test metadata content
+        metadata = json.loads(metadata_data)
+        print(f"Metadata keys: {list(metadata.keys())}")
+        if 'feature_names' in metadata:
+            print(f"Feature names: {metadata['feature_names']}")
+        if 'label_encoder_classes' in metadata:
+            print(f"Label classes: {metadata['label_encoder_classes']}")
         
         print("Successfully downloaded and validated both model files!")
         return True
@@ -14,14 +14,139 @@ Test Scenarios:
 - Normal: 10 users, 5 minutes  
 - Stress: 50 users, 2 minutes
 - Spike: 1 to 100 users over 1 minute
+
+The stress and spike users pace themselves with constant_throughput rather
+than a think time, so each user keeps a fixed request rate no matter how slow
+the API responds. With between() the arrival rate drops as latency grows,
+which throttles the load exactly when the service is under pressure.
+
+All users are FastHttpUser subclasses, which use the C-accelerated
+geventhttpclient instead of python-requests and keep pooled connections alive.
 """
 
+import itertools
 import random
-from locust import HttpUser, task, between
-import json
+from locust import task, between, constant_throughput
+from locust.contrib.fasthttp import FastHttpUser
+import orjson
+
+
+# Pool of randomized penguin samples encoded up front per locust worker.
+# The size is a power of two so a task can index it with raw random bits.
+_POOL_BITS = 13
+_POOL_SIZE = 1 << _POOL_BITS
+
+# Keep-alive lets each user reuse its pooled connection across requests
+_HDRS = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+
+# Samples share a fixed key order, so they are formatted straight into JSON
+_PAYLOAD_TEMPLATE = (
+    '{{"bill_length_mm":{bl},"bill_depth_mm":{bd},"flipper_length_mm":{fl},'
+    '"body_mass_g":{bm},"year":{yr},"sex":"{sx}","island":"{isl}"}}'
+)
+
+
+def _random_adelie():
+    """Adelie penguin characteristics (smaller, shorter bills)"""
+    return _PAYLOAD_TEMPLATE.format(
+        bl=random.uniform(32.1, 46.0),
+        bd=random.uniform(15.5, 21.5),
+        fl=random.randint(172, 210),
+        bm=random.randint(2850, 4775),
+        yr=random.choice([2007, 2008, 2009]),
+        sx=random.choice(["male", "female"]),
+        isl=random.choice(["Torgersen", "Biscoe", "Dream"])
+    ).encode()
+
+
+def _random_chinstrap():
+    """Chinstrap penguin characteristics (medium size, longer bills)"""
+    return _PAYLOAD_TEMPLATE.format(
+        bl=random.uniform(40.9, 58.0),
+        bd=random.uniform(16.4, 20.8),
+        fl=random.randint(178, 212),
+        bm=random.randint(2700, 4800),
+        yr=random.choice([2007, 2008, 2009]),
+        sx=random.choice(["male", "female"]),
+        isl="Dream"  # Chinstrap penguins are mainly on Dream island
+    ).encode()
+
+
+def _random_gentoo():
+    """Gentoo penguin characteristics (larger, distinctive features)"""
+    return _PAYLOAD_TEMPLATE.format(
+        bl=random.uniform(40.9, 59.6),
+        bd=random.uniform(13.1, 17.3),
+        fl=random.randint(203, 231),
+        bm=random.randint(3950, 6300),
+        yr=random.choice([2007, 2008, 2009]),
+        sx=random.choice(["male", "female"]),
+        isl="Biscoe"  # Gentoo penguins are mainly on Biscoe island
+    ).encode()
+
+
+def _generate_samples(n):
+    """Expand the species templates into n randomized, JSON-encoded samples."""
+    species_templates = [_random_adelie, _random_chinstrap, _random_gentoo]
+    return [random.choice(species_templates)() for _ in range(n)]
+
+
+# Built once at import so each task only picks a sample and posts it
+_POOL = _generate_samples(_POOL_SIZE)
+_rand_bits = random.Random().getrandbits
+
+# Successful responses are deep-validated whenever the counter hits the mask
+_VALIDATE_MASK = 0xFF
+_validation_counter = itertools.count()
+
+
+def _do_predict(client):
+    """
+    Post one pre-encoded penguin sample to /predict and validate the response.
+    
+    Shared by every user class so that predictions always go through the
+    calling user's own pooled HTTP session.
+    """
+    
+    # Pick one of the pre-encoded penguin samples
+    payload = _POOL[_rand_bits(_POOL_BITS)]
+    
+    # Make the prediction request
+    with client.post(
+        "/predict",
+        data=payload,
+        headers=_HDRS,
+        name="/predict",
+        catch_response=True
+    ) as response:
+        
+        if response.status_code == 200:
+            # Fully validate only one in every 256 responses to keep the client cheap
+            if next(_validation_counter) & _VALIDATE_MASK:
+                response.success()
+            else:
+                try:
+                    result = orjson.loads(response.content)
+                
+                    # Validate response structure
+                    if "predicted_species" not in result or "confidence" not in result:
+                        response.failure("Response missing required fields")
+                    elif result["predicted_species"] not in ["Adelie", "Chinstrap", "Gentoo"]:
+                        response.failure(f"Invalid species prediction: {result['predicted_species']}")
+                    elif not (0.0 <= result["confidence"] <= 1.0):
+                        response.failure(f"Invalid confidence score: {result['confidence']}")
+                    else:
+                        # Success case
+                        response.success()
+                    
+                except orjson.JSONDecodeError:
+                    response.failure("Response is not valid JSON")
+        else:
+            response.failure(f"HTTP {response.status_code}: {response.text}")
 
 
-class PenguinAPIUser(HttpUser):
+class PenguinAPIUser(FastHttpUser):
     """
     Simulates a user making requests to the Penguin Prediction API.
     
@@ -31,6 +156,12 @@ class PenguinAPIUser(HttpUser):
     
     wait_time = between(1, 3)  # Wait 1-3 seconds between requests
     
+    # geventhttpclient connection pool settings
+    network_timeout = 5.0
+    connection_timeout = 5.0
+    concurrency = 50
+    default_headers = _HDRS
+    
     def on_start(self):
         """Called when a user starts. Can be used for login, setup, etc."""
         pass
@@ -44,70 +175,7 @@ class PenguinAPIUser(HttpUser):
         with different species characteristics.
         """
         
-        # Define realistic penguin data ranges for each species
-        penguin_data_samples = [
-            # Adelie penguin characteristics (smaller, shorter bills)
-            {
-                "bill_length_mm": random.uniform(32.1, 46.0),
-                "bill_depth_mm": random.uniform(15.5, 21.5),
-                "flipper_length_mm": random.randint(172, 210),
-                "body_mass_g": random.randint(2850, 4775),
-                "year": random.choice([2007, 2008, 2009]),
-                "sex": random.choice(["male", "female"]),
-                "island": random.choice(["Torgersen", "Biscoe", "Dream"])
-            },
-            # Chinstrap penguin characteristics (medium size, longer bills)
-            {
-                "bill_length_mm": random.uniform(40.9, 58.0),
-                "bill_depth_mm": random.uniform(16.4, 20.8),
-                "flipper_length_mm": random.randint(178, 212),
-                "body_mass_g": random.randint(2700, 4800),
-                "year": random.choice([2007, 2008, 2009]),
-                "sex": random.choice(["male", "female"]),
-                "island": "Dream"  # Chinstrap penguins are mainly on Dream island
-            },
-            # Gentoo penguin characteristics (larger, distinctive features)
-            {
-                "bill_length_mm": random.uniform(40.9, 59.6),
-                "bill_depth_mm": random.uniform(13.1, 17.3),
-                "flipper_length_mm": random.randint(203, 231),
-                "body_mass_g": random.randint(3950, 6300),
-                "year": random.choice([2007, 2008, 2009]),
-                "sex": random.choice(["male", "female"]),
-                "island": "Biscoe"  # Gentoo penguins are mainly on Biscoe island
-            }
-        ]
-        
-        # Randomly select one of the penguin data samples
-        penguin_data = random.choice(penguin_data_samples)
-        
-        # Make the prediction request
-        with self.client.post(
-            "/predict",
-            json=penguin_data,
-            headers={"Content-Type": "application/json"},
-            catch_response=True
-        ) as response:
-            
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                    
-                    # Validate response structure
-                    if "predicted_species" not in result or "confidence" not in result:
-                        response.failure("Response missing required fields")
-                    elif result["predicted_species"] not in ["Adelie", "Chinstrap", "Gentoo"]:
-                        response.failure(f"Invalid species prediction: {result['predicted_species']}")
-                    elif not (0.0 <= result["confidence"] <= 1.0):
-                        response.failure(f"Invalid confidence score: {result['confidence']}")
-                    else:
-                        # Success case
-                        response.success()
-                        
-                except json.JSONDecodeError:
-                    response.failure("Response is not valid JSON")
-            else:
-                response.failure(f"HTTP {response.status_code}: {response.text}")
+        _do_predict(self.client)
     
     @task(1)  # Weight: 1/10 requests will be health checks
     def health_check(self):
@@ -116,15 +184,15 @@ class PenguinAPIUser(HttpUser):
         
         This simulates monitoring systems checking if the service is healthy.
         """
-        with self.client.get("/", catch_response=True) as response:
+        with self.client.get("/", name="/", catch_response=True) as response:
             if response.status_code == 200:
                 try:
-                    result = response.json()
+                    result = orjson.loads(response.content)
                     if "status" in result:
                         response.success()
                     else:
                         response.failure("Health check response missing status field")
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     response.failure("Health check response is not valid JSON")
             else:
                 response.failure(f"Health check failed: HTTP {response.status_code}")
@@ -177,21 +245,22 @@ class PenguinAPIUser(HttpUser):
         
         with self.client.post(
             "/predict",
-            json=invalid_data,
-            headers={"Content-Type": "application/json"},
+            data=orjson.dumps(invalid_data),
+            headers=_HDRS,
+            name="/predict",
             catch_response=True
         ) as response:
             
             # We expect error responses (400, 422) for invalid inputs
             if response.status_code in [400, 422]:
                 try:
-                    result = response.json()
+                    result = orjson.loads(response.content)
                     # Should have error details
                     if "detail" in result or "errors" in result:
                         response.success()
                     else:
                         response.failure("Error response missing detail/errors field")
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     response.failure("Error response is not valid JSON")
             elif response.status_code == 200:
                 # If it somehow returns 200, that's also acceptable
@@ -204,11 +273,11 @@ class StressTestUser(PenguinAPIUser):
     """
     Extended user class for stress testing scenarios.
     
-    This class has more aggressive timing and behavior patterns
-    to simulate high-stress conditions.
+    This class targets a fixed request rate per user to simulate
+    high-stress conditions independent of response times.
     """
     
-    wait_time = between(0.5, 2)  # Shorter wait times for stress testing
+    wait_time = constant_throughput(5)  # 5 requests/second per user
     
     @task(10)  # Higher weight for prediction requests during stress test
     def rapid_predictions(self):
@@ -220,14 +289,14 @@ class SpikeTestUser(PenguinAPIUser):
     """
     User class for spike testing scenarios.
     
-    Simulates sudden bursts of traffic with very little wait time.
+    Simulates sudden bursts of traffic at a high fixed request rate.
     """
     
-    wait_time = between(0.1, 0.5)  # Very short wait times for spike testing
+    wait_time = constant_throughput(20)  # 20 requests/second per user
 
 
 # Define different test scenarios
-class WebsiteUser(HttpUser):
+class WebsiteUser(FastHttpUser):
     """
     Realistic user simulation combining different usage patterns.
     
@@ -237,9 +306,18 @@ class WebsiteUser(HttpUser):
     
     wait_time = between(2, 5)  # More realistic user behavior
     
+    network_timeout = 5.0
+    connection_timeout = 5.0
+    default_headers = _HDRS
+    
+    # Only the first user spawned in each worker probes health on start
+    _health_checked = False
+    
     def on_start(self):
         """User starts by checking if the service is healthy."""
-        self.client.get("/")
+        if not type(self)._health_checked:
+            type(self)._health_checked = True
+            self.client.get("/", name="/")
     
     @task
     def predict_and_analyze(self):
@@ -252,10 +330,8 @@ class WebsiteUser(HttpUser):
         num_predictions = random.randint(1, 3)
         
         for _ in range(num_predictions):
-            # Use the prediction method from PenguinAPIUser
-            penguin_user = PenguinAPIUser()
-            penguin_user.client = self.client
-            penguin_user.predict_penguin_species()
+            # Reuse this user's session instead of building another user
+            _do_predict(self.client)
             
             # Brief pause between predictions in the same session
             self.wait()
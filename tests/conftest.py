@@ -1,7 +1,57 @@
+import json
 import pytest
-from app.main import load_model_and_metadata
+import numpy as np
+from types import SimpleNamespace
+from fastapi.testclient import TestClient
+from app import main
+from app.main import app, load_model_and_metadata, preprocess_features
 
-@pytest.fixture(scope="session", autouse=True)
+@pytest.fixture(scope="session")
 def load_model():
-    """Load model and metadata once for all tests"""
-    load_model_and_metadata()
\ No newline at end of file
+    """Load model and metadata once, only for tests that request it"""
+    load_model_and_metadata()
+
+@pytest.fixture(scope="session")
+def client():
+    """Share one TestClient across the whole test session; its startup event loads the model"""
+    with TestClient(app) as c:
+        yield c
+
+@pytest.fixture(scope="session")
+def validation_client():
+    """TestClient that never starts the app, for requests rejected before the model is used"""
+    return TestClient(app)
+
+@pytest.fixture(scope="session")
+def model_ctx(load_model):
+    """Model, label classes, feature names and their column positions, read once per session"""
+    # Read through the module, since loading rebinds its globals
+    return SimpleNamespace(
+        model=main.model,
+        classes=np.asarray(main.label_encoder_classes),
+        feature_names=tuple(main.feature_names),
+        feature_index=main.feature_index
+    )
+
+@pytest.fixture(scope="module")
+def single_threaded_model(model_ctx):
+    """Predict single-threaded for one test module, restoring the booster's thread count afterwards"""
+    booster = model_ctx.model.get_booster()
+    nthread = json.loads(booster.save_config())["learner"]["generic_param"]["nthread"]
+    # Test batches are tiny, so predict single-threaded instead of paying OpenMP fork/join
+    booster.set_param({"nthread": 1})
+    yield
+    booster.set_param({"nthread": int(nthread)})
+
+@pytest.fixture(scope="session")
+def cached_preprocess(load_model):
+    """Memoized preprocess_features; treat the returned DataFrames as read-only"""
+    # Keyed by field values, but each entry is built from the caller's own object,
+    # so unvalidated model_construct samples are never re-validated here
+    processed = {}
+    def _preprocess(penguin_data):
+        key = tuple(sorted(penguin_data.model_dump().items()))
+        if key not in processed:
+            processed[key] = preprocess_features(penguin_data)
+        return processed[key]
+    return _preprocess